@@ -3,7 +3,10 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.lines import Line2D
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from tracking_profiles import (
     CloseProfile, 
     MediumProfile, 
@@ -21,6 +24,16 @@ def visualize_tracking_profiles():
         VeryFarProfile()
     ]
     
+    # Desired drone position (behind target) for every profile, one row each
+    params = np.array([[profile.target_distance,
+                        profile.horizontal_offset,
+                        profile.altitude if profile.altitude is not None else 3.0]
+                       for profile in profiles])
+    drone_xyz = np.column_stack([-params[:, 0], params[:, 1], params[:, 2]])
+    origin = np.zeros_like(drone_xyz)
+    names = [profile.__class__.__name__ for profile in profiles]
+    colors = ['blue', 'green', 'purple', 'orange']
+    
     # Create figure
     fig = plt.figure(figsize=(15, 10))
     
@@ -34,31 +47,27 @@ def visualize_tracking_profiles():
     # Target position (origin)
     ax1.scatter(0, 0, color='red', s=100, marker='*', label='Target')
     
-    # Plot different profiles
-    colors = ['blue', 'green', 'purple', 'orange']
-    for i, profile in enumerate(profiles):
-        # Get desired drone position for this profile
-        distance = profile.target_distance
-        h_offset = profile.horizontal_offset
-        
-        # Calculate drone position (behind target)
-        drone_x = -distance
-        drone_y = h_offset
-        
-        # Plot drone position
-        ax1.scatter(drone_x, drone_y, color=colors[i], s=80, 
-                  marker='o', label=f'{profile.__class__.__name__} ({distance}m)')
-        
-        # Draw connection line
-        ax1.plot([0, drone_x], [0, drone_y], color=colors[i], linestyle='--', alpha=0.7)
-        
-        # Draw distance circle
-        circle = plt.Circle((0, 0), distance, color=colors[i], fill=False, alpha=0.3)
-        ax1.add_patch(circle)
+    # Plot drone positions
+    ax1.scatter(drone_xyz[:, 0], drone_xyz[:, 1], c=colors, s=80, marker='o')
+    
+    # Draw connection lines
+    ax1.add_collection(LineCollection(np.stack([origin[:, :2], drone_xyz[:, :2]], axis=1),
+                                      colors=colors, linestyles='--', alpha=0.7))
+    
+    # Draw distance circles
+    circles = [plt.Circle((0, 0), distance) for distance in params[:, 0]]
+    ax1.add_collection(PatchCollection(circles, facecolor='none', edgecolor=colors, alpha=0.3))
+    ax1.autoscale_view()
+    
+    legend_handles = [Line2D([], [], color='red', marker='*', markersize=10, linestyle='',
+                             label='Target')]
+    legend_handles += [Line2D([], [], color=colors[i], marker='o', linestyle='',
+                              label=f'{names[i]} ({params[i, 0]}m)')
+                       for i in range(len(profiles))]
     
     # Set equal aspect ratio
     ax1.set_aspect('equal')
-    ax1.legend()
+    ax1.legend(handles=legend_handles)
     
     # ---- 3D view ----
     ax2 = fig.add_subplot(1, 2, 2, projection='3d')
@@ -70,24 +79,18 @@ def visualize_tracking_profiles():
     # Target position (origin, at ground level)
     ax2.scatter(0, 0, 0, color='red', s=100, marker='*', label='Target')
     
-    # Plot different profiles
-    for i, profile in enumerate(profiles):
-        # Get desired drone position for this profile
-        distance = profile.target_distance
-        h_offset = profile.horizontal_offset
-        altitude = profile.altitude if profile.altitude is not None else 3.0
-        
-        # Calculate drone position (behind target)
-        drone_x = -distance
-        drone_y = h_offset
-        drone_z = altitude
-        
-        # Plot drone position
-        ax2.scatter(drone_x, drone_y, drone_z, color=colors[i], s=80,
-                  marker='o', label=f'{profile.__class__.__name__} ({distance}m, {altitude}m alt)')
-        
-        # Draw connection line
-        ax2.plot([0, drone_x], [0, drone_y], [0, drone_z], color=colors[i], linestyle='--', alpha=0.7)
+    # Plot drone positions
+    ax2.scatter(drone_xyz[:, 0], drone_xyz[:, 1], drone_xyz[:, 2], c=colors, s=80, marker='o')
+    
+    # Draw connection lines
+    ax2.add_collection3d(Line3DCollection(np.stack([origin, drone_xyz], axis=1),
+                                          colors=colors, linestyles='--', alpha=0.7))
+    
+    legend_handles = [Line2D([], [], color='red', marker='*', markersize=10, linestyle='',
+                             label='Target')]
+    legend_handles += [Line2D([], [], color=colors[i], marker='o', linestyle='',
+                              label=f'{names[i]} ({params[i, 0]}m, {params[i, 2]}m alt)')
+                       for i in range(len(profiles))]
     
     # Draw ground plane
     x_range = np.linspace(-25, 5, 10)
@@ -98,7 +101,7 @@ def visualize_tracking_profiles():
     
     # Set equal aspect ratio
     ax2.set_box_aspect([1, 1, 1])
-    ax2.legend()
+    ax2.legend(handles=legend_handles)
     
     plt.tight_layout()
     plt.savefig('tracking_profiles_visualization.png', dpi=300)
@@ -1,9 +1,64 @@
+import logging
+import math
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Below this horizontal distance (m) the direction to the target is undefined
+_MIN_DISTANCE = 1e-9
+
+
+@njit('UniTuple(float64, 3)(float64, float64, float64, float64, float64, '
+      'float64, float64, float64)', cache=True, fastmath=True)
+def _compute_move(cx, cy, tx, ty, dz, target_distance, horizontal_offset, max_speed):
+    """Movement vector (vx, vy, vz) towards the point behind the target"""
+    # Calculate current distance to target
+    dx = tx - cx
+    dy = ty - cy
+    
+    # Calculate horizontal distance
+    current_distance = math.hypot(dx, dy)
+    
+    # Unit vector towards target (cos/sin of the angle to target); the
+    # behind and perpendicular directions below are rotations of it, so no
+    # atan2/cos/sin are needed
+    if current_distance > _MIN_DISTANCE:
+        ux = dx / current_distance
+        uy = dy / current_distance
+    else:
+        ux, uy = 1.0, 0.0
+    
+    # Calculate desired position behind target: (cos, sin)(angle + pi) = (-ux, -uy)
+    desired_x = tx - ux * target_distance
+    desired_y = ty - uy * target_distance
+    
+    # Add horizontal offset: (cos, sin)(angle + pi/2) = (-uy, ux)
+    desired_x -= uy * horizontal_offset
+    desired_y += ux * horizontal_offset
+    
+    move_x = desired_x - cx
+    move_y = desired_y - cy
+    move_z = dz
+    
+    # Under the speed limit (the steady-state case) the vector is returned as
+    # is; only clamping needs the sqrt, division and rescale
+    move_magnitude_sq = move_x * move_x + move_y * move_y + move_z * move_z
+    if move_magnitude_sq <= max_speed * max_speed:
+        return (move_x, move_y, move_z)
+    
+    scale_factor = max_speed / math.sqrt(move_magnitude_sq)
+    return (move_x * scale_factor, move_y * scale_factor, move_z * scale_factor)
+
+
 class DistanceProfile:
     """Base class for drone tracking distance profiles"""
     
@@ -26,6 +81,10 @@ class DistanceProfile:
         self.distance_tolerance = distance_tolerance
         self.max_speed = max_speed
         
+        # Squared distance band for is_at_desired_distance (avoids sqrt)
+        self._lo_sq = max(0, target_distance - distance_tolerance) ** 2
+        self._hi_sq = (target_distance + distance_tolerance) ** 2
+        
         logger.info(f"Initialized {self.__class__.__name__} with target distance {target_distance}m")
     
     def calculate_movement_vector(self, current_position, target_position):
@@ -39,50 +98,72 @@ class DistanceProfile:
         Returns:
             tuple: Movement vector (vx, vy, vz) in m/s
         """
-        # Calculate current distance to target
-        dx = target_position[0] - current_position[0]
-        dy = target_position[1] - current_position[1]
-        dz = 0 if self.altitude is None else self.altitude - current_position[2]
+        dz = 0.0 if self.altitude is None else self.altitude - current_position[2]
+        
+        move_x, move_y, move_z = _compute_move(
+            current_position[0], current_position[1],
+            target_position[0], target_position[1], dz,
+            self.target_distance, self.horizontal_offset, self.max_speed)
+        
+        # Only pay for the debug output when it will be emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_move(current_position, target_position, move_x, move_y, move_z)
         
-        # Calculate horizontal distance
-        current_distance = np.sqrt(dx**2 + dy**2)
+        return (move_x, move_y, move_z)
+    
+    def _log_move(self, current_position, target_position, move_x, move_y, move_z):
+        """Debug output for one movement vector calculation"""
+        current_distance = math.hypot(target_position[0] - current_position[0],
+                                      target_position[1] - current_position[1])
+        logger.debug("Current distance: %.2fm, Target: %.2fm",
+                     current_distance, self.target_distance)
+        logger.debug("Movement vector: (%.2f, %.2f, %.2f) m/s", move_x, move_y, move_z)
+    
+    def calculate_movement_vectors(self, current_positions, target_positions):
+        """
+        Batch version of calculate_movement_vector for N position pairs
         
-        # Calculate angle to target
-        angle_to_target = np.arctan2(dy, dx)
+        Args:
+            current_positions (array-like): Drone positions, shape (N, 3), in meters
+            target_positions (array-like): Target positions, shape (N, 3), in meters
         
-        # Calculate desired position 
-        offset_angle = angle_to_target + np.pi  # Behind target
-        desired_x = target_position[0] + np.cos(offset_angle) * self.target_distance
-        desired_y = target_position[1] + np.sin(offset_angle) * self.target_distance
+        Returns:
+            np.ndarray: Movement vectors, shape (N, 3), in m/s
+        """
+        cur = np.asarray(current_positions, dtype=np.float64)
+        tgt = np.asarray(target_positions, dtype=np.float64)
         
-        # Add horizontal offset
-        perpendicular_angle = angle_to_target + np.pi/2  # 90 degrees to the right
-        desired_x += np.cos(perpendicular_angle) * self.horizontal_offset
-        desired_y += np.sin(perpendicular_angle) * self.horizontal_offset
+        # Unit vectors towards each target; (1, 0) where drone and target coincide
+        d = tgt[:, :2] - cur[:, :2]
+        r = np.hypot(d[:, 0], d[:, 1])
+        valid = r > _MIN_DISTANCE
+        safe_r = np.where(valid, r, 1.0)
+        ux = np.where(valid, d[:, 0] / safe_r, 1.0)
+        uy = np.where(valid, d[:, 1] / safe_r, 0.0)
         
-        move_x = desired_x - current_position[0]
-        move_y = desired_y - current_position[1]
-        move_z = dz
+        # Desired positions behind target plus perpendicular offset (-uy, ux)
+        desired_x = tgt[:, 0] - ux * self.target_distance - uy * self.horizontal_offset
+        desired_y = tgt[:, 1] - uy * self.target_distance + ux * self.horizontal_offset
         
-        move_magnitude = np.sqrt(move_x**2 + move_y**2 + move_z**2)
-        if move_magnitude > 0:
-            scale_factor = min(self.max_speed, move_magnitude) / move_magnitude
-            move_x *= scale_factor
-            move_y *= scale_factor
-            move_z *= scale_factor
+        move = np.empty_like(cur)
+        move[:, 0] = desired_x - cur[:, 0]
+        move[:, 1] = desired_y - cur[:, 1]
+        move[:, 2] = 0.0 if self.altitude is None else self.altitude - cur[:, 2]
         
-        logger.debug(f"Current distance: {current_distance:.2f}m, Target: {self.target_distance:.2f}m")
-        logger.debug(f"Movement vector: ({move_x:.2f}, {move_y:.2f}, {move_z:.2f}) m/s")
+        # Clamp each vector to max_speed
+        magnitude = np.linalg.norm(move, axis=1)
+        scale = np.minimum(self.max_speed, magnitude) / np.where(magnitude > 0, magnitude, 1.0)
+        move *= scale[:, np.newaxis]
         
-        return (move_x, move_y, move_z)
+        return move
     
     def is_at_desired_distance(self, current_position, target_position):
         """Check if drone is at the desired distance from target"""
         dx = target_position[0] - current_position[0]
         dy = target_position[1] - current_position[1]
-        current_distance = np.sqrt(dx**2 + dy**2)
+        d2 = dx * dx + dy * dy
         
-        return abs(current_distance - self.target_distance) <= self.distance_tolerance
+        return self._lo_sq <= d2 <= self._hi_sq
 
 
 class CloseProfile(DistanceProfile):
@@ -113,13 +194,22 @@ class VeryFarProfile(DistanceProfile):
                         distance_tolerance=2.0, max_speed=5.0)
 
 
+# Profiles are stateless after construction, so share one instance of each
+_PROFILE_CACHE = {
+    'close': CloseProfile(),
+    'medium': MediumProfile(),
+    'far': FarProfile(),
+    'very_far': VeryFarProfile()
+}
+
+
 def get_profile(distance):
     """Get appropriate tracking profile based on desired distance"""
     if distance <= 3:
-        return CloseProfile()
+        return _PROFILE_CACHE['close']
     elif distance <= 5:
-        return MediumProfile()
+        return _PROFILE_CACHE['medium']
     elif distance <= 10:
-        return FarProfile()
+        return _PROFILE_CACHE['far']
     else:
-        return VeryFarProfile()
\ No newline at end of file
+        return _PROFILE_CACHE['very_far']
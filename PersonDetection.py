@@ -1,13 +1,94 @@
+import os
 import cv2
 import numpy as np
 
+# MobileNet-SSD (Caffe) person detector, run on CUDA in FP16 when available
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+PROTOTXT_PATH = os.path.join(MODEL_DIR, 'MobileNetSSD_deploy.prototxt')
+MODEL_PATH = os.path.join(MODEL_DIR, 'MobileNetSSD_deploy.caffemodel')
+PERSON_CLASS_ID = 15
+CONFIDENCE_THRESHOLD = 0.5
+
+def load_person_net():
+    """Load the MobileNet-SSD network, or None if the model files are missing"""
+    if not (os.path.exists(PROTOTXT_PATH) and os.path.exists(MODEL_PATH)):
+        return None
+
+    net = cv2.dnn.readNetFromCaffe(PROTOTXT_PATH, MODEL_PATH)
+    if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+    return net
+
+net = load_person_net()
+
+# HOG fallback when the DNN model is not installed
 hog = cv2.HOGDescriptor()
 hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
 
+# Full detection runs every N frames; a KCF tracker follows the box in between
+DETECTION_WIDTH = 320
+DETECT_EVERY_N_FRAMES = 15
+
+_tracker = None
+_frames_since_detect = 0
+
 def detect_person(frame):
+    global _tracker, _frames_since_detect
+
+    _frames_since_detect += 1
+    if _tracker is not None and _frames_since_detect < DETECT_EVERY_N_FRAMES:
+        success, box = _tracker.update(frame)
+        if success:
+            return box
+
+    if net is not None:
+        box = _detect_person_dnn(frame)
+    else:
+        box = _detect_person_hog(frame)
+
+    if box is None:
+        _tracker = None
+        return None
+
+    _tracker = cv2.TrackerKCF_create()
+    _tracker.init(frame, tuple(int(v) for v in box))
+    _frames_since_detect = 0
+    return box
+
+def _detect_person_hog(frame):
+
+    # UMat lets OpenCV's T-API run resize and HOG on an OpenCL device if present
+    h, w = frame.shape[:2]
+    umat_frame = cv2.UMat(frame)
+
+    # HOG cost grows with pixel count, so detect on a downscaled copy
+    scale = 1.0
+    if w > DETECTION_WIDTH:
+        scale = w / DETECTION_WIDTH
+        umat_frame = cv2.resize(umat_frame, (DETECTION_WIDTH, h * DETECTION_WIDTH // w))
+
+    boxes, weights = hog.detectMultiScale(umat_frame, winStride=(8, 8))
 
-    boxes, weights = hog.detectMultiScale(frame, winStride=(8, 8))
-    
     if len(boxes) > 0:
-        return max(boxes, key=lambda box: box[2] * box[3])
+        areas = boxes[:, 2] * boxes[:, 3]
+        return (boxes[areas.argmax()] * scale).astype(int)
     return None
+
+def _detect_person_dnn(frame):
+
+    h, w = frame.shape[:2]
+    blob = cv2.dnn.blobFromImage(frame, 0.007843, (300, 300), 127.5)
+    net.setInput(blob)
+    detections = net.forward()[0, 0]
+
+    # Each row: [image_id, class_id, confidence, x1, y1, x2, y2] (normalized)
+    people = detections[(detections[:, 1] == PERSON_CLASS_ID) &
+                        (detections[:, 2] > CONFIDENCE_THRESHOLD)]
+    if len(people) == 0:
+        return None
+
+    corners = people[:, 3:7] * np.array([w, h, w, h])
+    boxes = np.column_stack([corners[:, :2], corners[:, 2:] - corners[:, :2]]).astype(int)
+    areas = boxes[:, 2] * boxes[:, 3]
+    return boxes[areas.argmax()]
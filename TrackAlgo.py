@@ -1,10 +1,23 @@
-def track_person(box, frame_center):
-    
-    x, y, w, h = box
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+@njit('UniTuple(int64, 2)(int64, int64, int64, int64, int64, int64)', cache=True)
+def _box_offset(x, y, w, h, frame_center_x, frame_center_y):
+
     box_center_x = x + w // 2
     box_center_y = y + h // 2
-    
-    offset_x = box_center_x - frame_center[0]
-    offset_y = box_center_y - frame_center[1]
-    
-    return movement_commands
\ No newline at end of file
+
+    offset_x = box_center_x - frame_center_x
+    offset_y = box_center_y - frame_center_y
+
+    return (offset_x, offset_y)
+
+def track_person(box, frame_center):
+
+    x, y, w, h = box
+    return _box_offset(int(x), int(y), int(w), int(h),
+                       int(frame_center[0]), int(frame_center[1]))
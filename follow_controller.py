@@ -13,11 +13,21 @@ from tracking_profiles import get_profile
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# type_mask for SET_POSITION_TARGET_LOCAL_NED with only velocities enabled
+VELOCITY_TYPE_MASK = 0b0000111111000111
+
+# Velocity changes below this (m/s) are treated as a repeat of the last command
+VELOCITY_TOLERANCE = 0.01
+
+# Repeated commands are still resent this often (s) so the autopilot does not
+# time out the velocity setpoint
+VELOCITY_RESEND_INTERVAL = 1.0
+
 class FollowController:
     """Main controller for FollowFly drone"""
     
     def __init__(self, connection_string='udp:127.0.0.1:14550', 
-                 tracking_distance=5.0, home_location=None):
+                 tracking_distance=5.0, home_location=None, control_rate=20.0):
         """
         Initialize the Follow Controller
         
@@ -25,12 +35,20 @@ class FollowController:
             connection_string (str): Connection string for vehicle
             tracking_distance (float): Initial tracking distance in meters
             home_location (tuple): Optional home location (lat, lon, alt)
+            control_rate (float): Follow loop frequency in Hz
         """
         self.connection_string = connection_string
         self.vehicle = None
         self.is_following = False
         self.tracking_thread = None
         self.stop_event = threading.Event()
+        self.control_period = 1.0 / control_rate
+        
+        # MAVLink velocity command state
+        self._encode_velocity = None
+        self._velocity_msg = None
+        self._last_vel = None
+        self._last_vel_time = 0.0
         
         # Initialize tracking profile
         self.tracking_profile = get_profile(tracking_distance)
@@ -52,6 +70,20 @@ class FollowController:
                                  self.vehicle.location.global_frame.alt)
             logger.info(f"Set home location to current position: {self.home_location}")
         
+        # Cache the message encoder and build one velocity message whose
+        # vx/vy/vz fields are overwritten per command (pack() runs on send)
+        self._encode_velocity = self.vehicle.message_factory.set_position_target_local_ned_encode
+        self._velocity_msg = self._encode_velocity(
+            0,       # time_boot_ms (not used)
+            0, 0,    # target system, target component
+            mavutil.mavlink.MAV_FRAME_LOCAL_NED, # frame
+            VELOCITY_TYPE_MASK, # type_mask (only speeds enabled)
+            0, 0, 0, # x, y, z positions (not used)
+            0, 0, 0, # x, y, z velocity in m/s
+            0, 0, 0, # x, y, z acceleration 
+            0, 0)    # yaw, yaw_rate
+        self._last_vel = None
+        
         logger.info("Connected to drone successfully")
         return self.vehicle
     
@@ -111,18 +143,25 @@ class FollowController:
             velocity_y (float): Velocity in East direction (m/s)
             velocity_z (float): Velocity in Down direction (m/s)
         """
-        msg = self.vehicle.message_factory.set_position_target_local_ned_encode(
-            0,       # time_boot_ms (not used)
-            0, 0,    # target system, target component
-            mavutil.mavlink.MAV_FRAME_LOCAL_NED, # frame
-            0b0000111111000111, # type_mask (only speeds enabled)
-            0, 0, 0, # x, y, z positions (not used)
-            velocity_x, velocity_y, velocity_z, # x, y, z velocity in m/s
-            0, 0, 0, # x, y, z acceleration 
-            0, 0)    # yaw, yaw_rate
+        # Skip commands that repeat the last one, but keep the setpoint alive
+        now = time.monotonic()
+        last = self._last_vel
+        if (last is not None
+                and now - self._last_vel_time < VELOCITY_RESEND_INTERVAL
+                and abs(velocity_x - last[0]) < VELOCITY_TOLERANCE
+                and abs(velocity_y - last[1]) < VELOCITY_TOLERANCE
+                and abs(velocity_z - last[2]) < VELOCITY_TOLERANCE):
+            return
         
+        msg = self._velocity_msg
+        msg.vx = velocity_x
+        msg.vy = velocity_y
+        msg.vz = velocity_z
+        
+        # No flush(): the MAVLink connection writes the message out on send
         self.vehicle.send_mavlink(msg)
-        self.vehicle.flush()
+        self._last_vel = (velocity_x, velocity_y, velocity_z)
+        self._last_vel_time = now
     
     def start_following(self, target_tracker):
         """
@@ -138,47 +177,62 @@ class FollowController:
         self.is_following = True
         self.stop_event.clear()
         
-        def follow_loop():
-            logger.info("Starting follow loop")
-            
+        # Start tracking in a separate thread
+        self.tracking_thread = threading.Thread(target=self._follow_loop,
+                                                args=(target_tracker,))
+        self.tracking_thread.daemon = True
+        self.tracking_thread.start()
+        logger.info("Started following target")
+    
+    def _follow_loop(self, target_tracker):
+        """Control loop: one follow tick per control period (runs in separate thread)"""
+        logger.info("Starting follow loop")
+        
+        # Schedule ticks against a monotonic deadline so that jitter in one
+        # iteration does not accumulate into the next
+        deadline = time.monotonic()
+        
+        try:
             while not self.stop_event.is_set():
                 try:
-                    # Get target position from vision system
-                    target_position = target_tracker.get_target_position()
-                    
-                    # Skip if no target detected
-                    if target_position is None:
-                        logger.warning("No target detected")
-                        # Send hover command (zero velocity)
-                        self.send_velocity_command(0, 0, 0)
-                        time.sleep(0.1)
-                        continue
-                    
-                    # Current drone position
-                    current_position = self.get_current_position()
-                    
-                    # Calculate movement vector
-                    movement_vector = self.tracking_profile.calculate_movement_vector(
-                        current_position, target_position)
-                    
-                    # Send velocity command to drone
-                    self.send_velocity_command(*movement_vector)
-                    
+                    self._follow_tick(target_tracker)
                 except Exception as e:
-                    logger.error(f"Error in follow loop: {e}")
+                    logger.error("Error in follow loop: %s", e)
                 
                 # Control frequency
-                time.sleep(0.1)
-            
+                deadline += self.control_period
+                sleep_for = deadline - time.monotonic()
+                if sleep_for <= 0:
+                    # Overran by more than a period; resync instead of bursting
+                    deadline = time.monotonic()
+                    continue
+                # Waiting on the stop event lets stop_following() wake us at once
+                self.stop_event.wait(sleep_for)
+        finally:
             # Stop moving when follow loop ends
             self.send_velocity_command(0, 0, 0)
             logger.info("Follow loop ended")
+    
+    def _follow_tick(self, target_tracker):
+        """Read target, compute movement and send one velocity command"""
+        # Get target position from vision system
+        target_position = target_tracker.get_target_position()
         
-        # Start following in a separate thread
-        self.tracking_thread = threading.Thread(target=follow_loop)
-        self.tracking_thread.daemon = True
-        self.tracking_thread.start()
-        logger.info("Started following target")
+        if target_position is None:
+            logger.warning("No target detected")
+            # Send hover command (zero velocity)
+            self.send_velocity_command(0, 0, 0)
+            return
+        
+        # Current drone position
+        current_position = self.get_current_position()
+        
+        # Calculate movement vector (a tuple of plain floats)
+        movement_vector = self.tracking_profile.calculate_movement_vector(
+            current_position, target_position)
+        
+        # Send velocity command to drone
+        self.send_velocity_command(*movement_vector)
     
     def stop_following(self):
         """Stop following the target"""
@@ -1,3 +1,4 @@
+import os
 import time
 import argparse
 import logging
@@ -18,6 +19,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# CPU cores for the vision and follow threads (Linux only)
+VISION_CPUS = {0, 1}
+FOLLOW_CPUS = {2}
+
 # Global variables for clean shutdown
 vision_tracker = None
 follow_controller = None
@@ -37,6 +42,17 @@ def parse_arguments():
                       help='Vehicle connection string')
     parser.add_argument('--camera', type=int, default=0,
                       help='Camera index (default: 0)')
+    parser.add_argument('--camera-size', type=int, nargs=2, default=None,
+                      metavar=('WIDTH', 'HEIGHT'),
+                      help='Capture resolution to request from the camera (uses MJPG when supported)')
+    parser.add_argument('--camera-fps', type=float, default=None,
+                      help='Capture frame rate to request from the camera')
+    parser.add_argument('--vision-nice', type=int, default=None,
+                      help='Nice value for the vision threads, e.g. -10 (negative values need CAP_SYS_NICE)')
+    parser.add_argument('--model', default=None,
+                      help='Optional SSD person detection model (replaces HOG detection)')
+    parser.add_argument('--model-config', default=None,
+                      help='Network config file for --model (e.g. .prototxt)')
     parser.add_argument('--distance', type=float, default=5.0,
                       help='Initial tracking distance in meters (default: 5.0)')
     parser.add_argument('--altitude', type=float, default=3.0,
@@ -46,13 +62,32 @@ def parse_arguments():
     
     return parser.parse_args()
 
+def pin_thread(thread, cpus):
+    """Pin a running thread to the given CPU cores where supported"""
+    if thread is None or not hasattr(os, 'sched_setaffinity'):
+        return
+    if max(cpus) >= (os.cpu_count() or 1):
+        return
+    try:
+        os.sched_setaffinity(thread.native_id, cpus)
+        logger.info(f"Pinned {thread.name} to CPUs {sorted(cpus)}")
+    except OSError as e:
+        logger.warning(f"Could not pin {thread.name}: {e}")
+
 def setup_system(args):
     """Set up vision tracking and drone control systems"""
     global vision_tracker, follow_controller
     
     # Initialize vision system
     logger.info("Initializing vision tracking system...")
-    vision_tracker = VisionTracker(camera_source=args.camera)
+    vision_tracker = VisionTracker(camera_source=args.camera,
+                                   capture_size=args.camera_size,
+                                   capture_fps=args.camera_fps,
+                                   model_path=args.model,
+                                   config_path=args.model_config,
+                                   opencv_threads=len(VISION_CPUS),
+                                   tracking_cpus=VISION_CPUS,
+                                   tracking_nice=args.vision_nice)
     
     # Initialize drone controller
     if not args.simulate:
@@ -93,6 +128,10 @@ def run_interactive_mode():
                 if vision_tracker and follow_controller:
                     vision_tracker.start()
                     follow_controller.start_following(vision_tracker)
+                    
+                    # Keep control off the vision cores (the tracking thread
+                    # pins itself to VISION_CPUS)
+                    pin_thread(follow_controller.tracking_thread, FOLLOW_CPUS)
                     print("Started following target")
                 else:
                     print("System not fully initialized")
@@ -1,86 +1,524 @@
 # vision_tracker.py
 # FollowFly vision system for person detection and tracking
 
+import os
+import math
+import platform
 import cv2
 import numpy as np
 import time
 import logging
 import threading
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SSD person detector settings (MobileNet-SSD, VOC classes)
+DNN_INPUT_SIZE = (300, 300)
+DNN_SCALE = 0.007843
+DNN_MEAN = 127.5
+DNN_PERSON_CLASS_ID = 15
+DNN_CONFIDENCE_THRESHOLD = 0.5
+
+# HOG people detector settings, shared by the CPU and CUDA detectors. Both
+# build the whole scale pyramid inside one detectMultiScale call and spread
+# the levels over worker threads (parallel_for_) or GPU kernels
+HOG_WIN_SIZE = (64, 128)
+HOG_WIN_STRIDE = (8, 8)
+HOG_PADDING = (8, 8)
+HOG_SCALE = 1.05
+
+# Motion gate for the KCF update: the target box is compared as a small
+# grayscale thumbnail, and while its mean absolute change stays under the
+# threshold the tracker update is skipped for up to MOTION_MAX_SKIPPED_FRAMES
+MOTION_ROI_SIZE = (64, 64)
+MOTION_THRESHOLD = 3.0
+MOTION_MAX_SKIPPED_FRAMES = 5
+
+# Constant-velocity Kalman filter over the target box, state
+# (cx, cy, w, h, vx, vy) in pixels and pixels per camera frame; the noise
+# values are variances in px^2 (process noise per camera frame)
+KALMAN_PROCESS_NOISE = 1.0
+KALMAN_TRACKER_NOISE = 4.0
+KALMAN_DETECTION_NOISE = 64.0
+
+# Squared Mahalanobis distance between a detection and the filtered box
+# above which the KCF tracker is re-seeded (chi-square, 4 dof, p = 0.001)
+KALMAN_REINIT_DISTANCE = 18.47
+
+# Overlap between a detection and the filtered box below which the KCF
+# tracker is re-seeded even when the distance gate passes. KCF holds on to
+# whatever box it was seeded with, so a small offset it picked up would
+# otherwise never be corrected while the target stands still
+KALMAN_REINIT_IOU = 0.8
+
+# DNN backend/target pairs in order of preference; the first pair whose target
+# is available in this OpenCV build is used
+DNN_BACKEND_TARGET_PAIRS = [
+    (cv2.dnn.DNN_BACKEND_CUDA, cv2.dnn.DNN_TARGET_CUDA_FP16),
+    (cv2.dnn.DNN_BACKEND_CUDA, cv2.dnn.DNN_TARGET_CUDA),
+    (getattr(cv2.dnn, 'DNN_BACKEND_TIMVX', None), getattr(cv2.dnn, 'DNN_TARGET_NPU', None)),
+    (cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_OPENCL_FP16),
+    (cv2.dnn.DNN_BACKEND_OPENCV, cv2.dnn.DNN_TARGET_CPU),
+]
+
+def log_opencv_build():
+    """Log the SIMD baseline and parallel backend this OpenCV build uses"""
+    info = {}
+    for line in cv2.getBuildInformation().splitlines():
+        key, sep, value = line.strip().partition(':')
+        if sep and key in ('Baseline', 'Dispatched code generation', 'Parallel framework'):
+            info[key] = value.strip()
+    
+    baseline = info.get('Baseline', '')
+    dispatched = info.get('Dispatched code generation', '')
+    parallel = info.get('Parallel framework', '')
+    logger.info(f"OpenCV {cv2.__version__}: baseline [{baseline}], "
+                f"dispatched [{dispatched}], parallel framework [{parallel}]")
+    
+    if platform.machine().lower() in ('x86_64', 'amd64') and 'AVX2' not in f"{baseline} {dispatched}":
+        logger.warning("OpenCV build has no AVX2 code paths; HOG will be slower. "
+                       "Rebuild with -DCPU_BASELINE=AVX2 -DCPU_DISPATCH=AVX2,AVX512_SKX")
+    if not parallel or parallel.lower() == 'none':
+        logger.warning("OpenCV build has no parallel framework; rebuild with -DWITH_TBB=ON")
+
+
+@njit('UniTuple(float64, 3)(float64, float64, float64, float64, float64, '
+      'float64, float64)', cache=True, fastmath=True)
+def _pos_from_bbox(center_x, center_y, w, real_width_focal, real_width,
+                   frame_center_x, frame_center_y):
+    """
+    Target position (north, east, down) in meters from a box centre and
+    width; real_width_focal is real_width * focal_length
+    """
+    # Calculate distance based on apparent size
+    # Using simple pinhole camera model: 
+    # distance = (real_width * focal_length) / apparent_width
+    distance_z = real_width_focal / w
+    
+    # Calculate horizontal position (x, y) relative to camera
+    # Convert from pixel coordinates to meters using similar triangle
+    pixel_to_meter = real_width / w
+    pos_x = (center_x - frame_center_x) * pixel_to_meter
+    
+    # Convert to NED coordinates (assuming camera pointing north)
+    # In NED: x=North, y=East, z=Down
+    # This is a simplified conversion and would need to be adjusted
+    # based on actual drone orientation and camera mounting
+    ned_x = distance_z  # Person is in front of drone (North)
+    ned_y = -pos_x      # Positive pixel x is right, negative NED y is right (East)
+    ned_z = -1.7        # Assuming person height, camera pointing horizontally
+    
+    return (ned_x, ned_y, ned_z)
+
+
+class FrameRingBuffer:
+    """
+    Three preallocated frame slots shared by one capture thread and one
+    consumer. The writer fills a back slot and publishes it; the reader
+    always takes the newest published frame, so stale frames are dropped
+    instead of queued. The frame returned by read_latest() stays valid
+    until the next read_latest() call. Other threads may take a copy of the
+    newest frame with copy_latest() without consuming it. Frames are
+    returned with their sequence number (1 for the first frame written,
+    counting every frame), so readers can tell how many frames apart two
+    frames are.
+    """
+    
+    def __init__(self, shape, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self._slots = [np.empty(shape, dtype=dtype) for _ in range(3)]
+        self._back = 0    # being written by the capture thread
+        self._ready = 1   # newest published frame
+        self._front = 2   # held by the consumer
+        self._newest = None  # slot of the newest published frame, if any
+        self._seq = 0
+        self._slot_seq = [0, 0, 0]
+        self._fresh = False
+        self._cond = threading.Condition()
+    
+    def clear(self):
+        """Forget published frames, e.g. before reusing the buffer for a new capture"""
+        with self._cond:
+            self._newest = None
+            self._fresh = False
+    
+    def write(self, frame):
+        """Copy frame into the back slot and publish it as the newest"""
+        slot = self._slots[self._back]
+        if slot.shape != frame.shape or slot.dtype != frame.dtype:
+            # Frame size changed mid-stream
+            slot = self._slots[self._back] = np.empty_like(frame)
+            self.shape = frame.shape
+        np.copyto(slot, frame)
+        
+        with self._cond:
+            self._seq += 1
+            self._slot_seq[self._back] = self._seq
+            self._back, self._ready = self._ready, self._back
+            self._newest = self._ready
+            self._fresh = True
+            self._cond.notify()
+    
+    def read_latest(self, timeout=None):
+        """
+        Wait for a frame newer than the last one read
+        
+        Returns:
+            tuple: (frame, sequence number), or (None, None) on timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._fresh, timeout):
+                return None, None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+            seq = self._slot_seq[self._front]
+        return self._slots[self._front], seq
+    
+    def copy_latest(self, out=None):
+        """
+        Copy the newest published frame (into out if given)
+        
+        Returns:
+            tuple: (frame, sequence number), or (None, None) before the first frame
+        """
+        with self._cond:
+            # The writer never fills the newest slot, so it is stable here
+            if self._newest is None:
+                return None, None
+            frame = self._slots[self._newest]
+            seq = self._slot_seq[self._newest]
+            if out is None or out.shape != frame.shape or out.dtype != frame.dtype:
+                return frame.copy(), seq
+            np.copyto(out, frame)
+            return out, seq
+
+
 class VisionTracker:
     """Computer vision system for person detection and tracking"""
     
     def __init__(self, camera_source=0, detection_interval=0.5, 
-                 focal_length=800, real_width=0.5):
+                 focal_length=800, real_width=0.5, target_timeout=0.5,
+                 model_path=None, config_path=None, opencv_threads=None,
+                 tracking_cpus=None, tracking_nice=None,
+                 capture_size=None, capture_fps=None):
         """
         Initialize the vision tracker
         
         Args:
-            camera_source: Camera source (0 for default camera, file path for video)
+            camera_source: Camera source (0 for default camera, file path for video,
+                           or a GStreamer pipeline string)
             detection_interval: How often to run detection (seconds)
             focal_length: Camera focal length in pixels
             real_width: Approximate width of a person in meters (for distance estimation)
+            target_timeout: Age in seconds after which a target position is considered lost
+            model_path: Optional SSD person detection model (e.g. MobileNetSSD_deploy.caffemodel);
+                        when given it replaces HOG detection
+            config_path: Network config for model_path (e.g. MobileNetSSD_deploy.prototxt)
+            opencv_threads: Worker threads for OpenCV's parallel_for_ (default: one per
+                            core in tracking_cpus, or all cores but two when
+                            unpinned)
+            tracking_cpus: Optional set of CPU cores to pin the tracking and
+                           detection threads to (Linux)
+            tracking_nice: Optional nice value for those threads, e.g. -10
+                           (Linux; negative values need CAP_SYS_NICE)
+            capture_size: Optional (width, height) to request from a camera index
+            capture_fps: Optional frame rate to request from a camera index
         """
         self.camera_source = camera_source
         self.detection_interval = detection_interval
-        self.focal_length = focal_length
-        self.real_width = real_width
+        self._focal_length = focal_length
+        self._real_width = real_width
+        self.target_timeout = target_timeout
+        self.tracking_cpus = tracking_cpus
+        self.tracking_nice = tracking_nice
+        self.capture_size = capture_size
+        self.capture_fps = capture_fps
         
         self.cap = None
         self.frame_width = 0
         self.frame_height = 0
         self.frame_center = (0, 0)
+        self._frame_period = 0.0
+        
+        # Per-frame constants for _update_target_position (see
+        # _update_distance_constants)
+        self._update_distance_constants()
+        self._fcx = 0.0
+        self._fcy = 0.0
+        
+        # HOG detection resolution and the factors mapping it back to the frame
+        self._detect_size = (0, 0)
+        self._scale_x = 1.0
+        self._scale_y = 1.0
+        self._scale_vec = np.ones(4)
         
         # Tracking variables
-        self.target_position = None  # 3D position (x, y, z) in local coordinates
-        self.target_bbox = None      # 2D bounding box (x, y, w, h) in image
-        self.last_detection_time = 0
+        # Latest (position, monotonic timestamp) published by the tracking
+        # thread; replaced with a single assignment so readers never block
+        self._latest = (None, 0.0)
+        # 2D bounding box (x, y, w, h) in image, updated in place; only
+        # meaningful while _bbox_valid is set
+        self.target_bbox = np.zeros(4, dtype=np.int32)
+        self._bbox_valid = False
+        
+        # Newest result of the detection thread: _detection_bbox is the box,
+        # or None if no person was found, _detection_frame and _detection_seq
+        # the frame it was detected on and its sequence number, and
+        # _detection_pending is set until the tracking thread has taken it.
+        # Frame buffers change hands only under _detection_lock: the detection
+        # thread owns _detect_frame, the tracking thread owns _seed_frame, and
+        # _detection_frame belongs to whichever side swaps it out next
+        self._detection_lock = threading.Lock()
+        self._detection_bbox = None
+        self._detection_frame = None
+        self._detection_seq = 0
+        self._detection_pending = False
+        self._detect_now = threading.Event()
+        
+        # Smooths the tracker and detector boxes (see KALMAN_PROCESS_NOISE)
+        self._kalman = self._create_kalman()
+        self._measurement = np.zeros((4, 1), dtype=np.float32)
+        self._tracker_noise = np.eye(4, dtype=np.float32) * KALMAN_TRACKER_NOISE
+        self._reset_tracking_state()
         
         # Thread control
         self.is_running = False
         self.stop_event = threading.Event()
         self.tracker_thread = None
+        self.detection_thread = None
+        self.capture_thread = None
+        self._frames = None
+        self._gray = None
+        self._detect_frame = None
+        self._seed_frame = None
+        self._display_buffer = None
+        
+        # Target box thumbnails for the motion gate (see MOTION_THRESHOLD)
+        self._roi_small = np.empty(MOTION_ROI_SIZE[::-1] + (3,), dtype=np.uint8)
+        self._motion_ref = np.empty(MOTION_ROI_SIZE[::-1], dtype=np.uint8)
+        self._motion_cur = np.empty(MOTION_ROI_SIZE[::-1], dtype=np.uint8)
+        self._motion_limit = MOTION_THRESHOLD * MOTION_ROI_SIZE[0] * MOTION_ROI_SIZE[1]
+        
+        # Make sure HOG gets the optimized SIMD kernels. The worker pool is
+        # sized to the cores the vision threads run on, leaving two cores for
+        # the MAVLink and follow threads when nothing is pinned
+        if opencv_threads is None:
+            if tracking_cpus:
+                opencv_threads = len(tracking_cpus)
+            else:
+                opencv_threads = max(1, (os.cpu_count() or 1) - 2)
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(opencv_threads)
+        log_opencv_build()
+        
+        # Detectors are built on the first start() and kept across restarts
+        self.model_path = model_path
+        self.config_path = config_path
+        self.net = None
+        self.hog = None
+        self.d_hog = None
+        self._use_opencl = False
+        self.tracker = None
+        self._detectors_ready = False
+        
+        logger.info("Vision tracker initialized")
+    
+    def _lazy_init(self):
+        """Build the detectors once; later start() calls reuse them"""
+        if self._detectors_ready:
+            return
+        
+        # Initialize DNN detector if a model was given
+        if self.model_path is not None:
+            self.net = self._load_net(self.model_path, self.config_path)
         
         # Initialize HOG detector
         self.hog = cv2.HOGDescriptor()
         self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
         
-        # Initialize tracker
-        self.tracker = cv2.TrackerKCF_create()
+        # Run HOG on the GPU when OpenCV was built with CUDA; the CPU
+        # detector above remains the fallback
+        if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            self.d_hog = cv2.cuda.HOG_create(HOG_WIN_SIZE)
+            self.d_hog.setSVMDetector(self.d_hog.getDefaultPeopleDetector())
+            self.d_hog.setWinStride(HOG_WIN_STRIDE)
+            self.d_hog.setScaleFactor(HOG_SCALE)
+            
+            # Device buffers reused for every detection
+            self._gpu_gray = cv2.cuda_GpuMat()
+            self._gpu_small = cv2.cuda_GpuMat()
+            logger.info("Using CUDA HOG detector")
+        elif cv2.ocl.haveOpenCL():
+            # Without CUDA, pass UMat images so the T-API runs the CPU HOG's
+            # OpenCL kernels on an integrated GPU
+            cv2.ocl.useOpenCL(True)
+            self._use_opencl = cv2.ocl.useOpenCL()
+            if self._use_opencl:
+                logger.info("Using OpenCL HOG detector")
         
-        logger.info("Vision tracker initialized")
+        # The KCF tracker is created when the first detection seeds it
+        self._detectors_ready = True
+    
+    @property
+    def focal_length(self):
+        """Camera focal length in pixels"""
+        return self._focal_length
+    
+    @focal_length.setter
+    def focal_length(self, value):
+        self._focal_length = value
+        self._update_distance_constants()
+    
+    @property
+    def real_width(self):
+        """Approximate width of a person in meters"""
+        return self._real_width
+    
+    @real_width.setter
+    def real_width(self, value):
+        self._real_width = value
+        self._update_distance_constants()
+    
+    def _update_distance_constants(self):
+        """Recompute the cached floats _update_target_position passes to _pos_from_bbox"""
+        self._rw = float(self._real_width)
+        self._rw_f = float(self._real_width * self._focal_length)
     
     def start(self):
         """Start the vision tracking system"""
         if self.is_running:
             logger.warning("Vision tracker is already running")
             return
+        
+        self._lazy_init()
             
         # Open camera
-        self.cap = cv2.VideoCapture(self.camera_source)
+        self.cap = self._open_capture(self.camera_source)
         if not self.cap.isOpened():
             raise RuntimeError(f"Failed to open camera source: {self.camera_source}")
             
-        # Get camera properties
-        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        self.frame_center = (self.frame_width // 2, self.frame_height // 2)
+        # Take the frame size from a real frame; backends such as GStreamer
+        # may report 0 or a different size through CAP_PROP_FRAME_WIDTH/HEIGHT
+        ret, first_frame = self.cap.read()
+        if not ret:
+            self.cap.release()
+            self.cap = None
+            raise RuntimeError(f"Failed to read a frame from camera source: {self.camera_source}")
+        self._set_frame_size(first_frame.shape[1], first_frame.shape[0])
         
         logger.info(f"Camera opened: {self.frame_width}x{self.frame_height}")
         
-        # Start tracking in separate thread
+        # A camera's read() blocks until the next frame, but a video file
+        # returns at once, so files are paced at their own frame rate
+        self._frame_period = 0.0
+        if isinstance(self.camera_source, str) and os.path.isfile(self.camera_source):
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if fps > 0:
+                self._frame_period = 1.0 / fps
+        
+        # Frames are handed from the capture thread to the tracking thread
+        # through preallocated slots; buffers from a previous run are reused
+        # when the frame size has not changed
+        frame_shape = (self.frame_height, self.frame_width, 3)
+        if self._frames is None or self._frames.shape != frame_shape:
+            self._frames = FrameRingBuffer(frame_shape)
+            
+            # Frame copies exchanged between the detection and tracking
+            # threads, and the detection thread's grayscale buffer
+            self._detect_frame = np.empty(frame_shape, dtype=np.uint8)
+            self._detection_frame = np.empty(frame_shape, dtype=np.uint8)
+            self._seed_frame = np.empty(frame_shape, dtype=np.uint8)
+            self._gray = np.empty(frame_shape[:2], dtype=np.uint8)
+            
+            # capture_frame() copies and annotates into this buffer
+            self._display_buffer = np.empty(frame_shape, dtype=np.uint8)
+        else:
+            self._frames.clear()
+        self._frames.write(first_frame)
+        
+        with self._detection_lock:
+            self._detection_bbox = None
+            self._detection_pending = False
+        self._detect_now.clear()
+        
+        # Start capture, detection and tracking in separate threads
         self.is_running = True
         self.stop_event.clear()
-        self.tracker_thread = threading.Thread(target=self._tracking_loop)
+        self.capture_thread = threading.Thread(target=self._capture_loop,
+                                               name='VisionCapture')
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+        self.detection_thread = threading.Thread(target=self._detection_loop,
+                                                 name='VisionDetection')
+        self.detection_thread.daemon = True
+        self.detection_thread.start()
+        self.tracker_thread = threading.Thread(target=self._tracking_loop,
+                                               name='VisionTracking')
         self.tracker_thread.daemon = True
         self.tracker_thread.start()
         
         logger.info("Vision tracker started")
     
+    def _set_frame_size(self, width, height):
+        """Frame size and the detection size and scale factors derived from it"""
+        self.frame_width = width
+        self.frame_height = height
+        self.frame_center = (width // 2, height // 2)
+        self._fcx, self._fcy = float(self.frame_center[0]), float(self.frame_center[1])
+        
+        # Fixed while the size is, so compute the detection size and scale once
+        self._detect_size = (min(width, 640), min(height, 480))
+        self._scale_x = width / self._detect_size[0]
+        self._scale_y = height / self._detect_size[1]
+        self._scale_vec = np.array([self._scale_x, self._scale_y,
+                                    self._scale_x, self._scale_y])
+    
+    def _open_capture(self, source):
+        """
+        Open the camera with a one-frame driver queue so reads return the
+        newest frame instead of one buffered 100-300 ms ago
+        
+        Args:
+            source: Camera index, video file path, or GStreamer pipeline
+                    (any string containing '!')
+        """
+        if isinstance(source, str) and '!' in source:
+            # The pipeline should end in "appsink drop=1 max-buffers=1"
+            return cv2.VideoCapture(source, cv2.CAP_GSTREAMER)
+        
+        if not isinstance(source, int):
+            return cv2.VideoCapture(source)
+        
+        v4l2 = platform.system() == 'Linux'
+        cap = cv2.VideoCapture(source, cv2.CAP_V4L2) if v4l2 else cv2.VideoCapture(source)
+        
+        configure = self.capture_size is not None or self.capture_fps is not None
+        if configure and v4l2:
+            # Compressed frames keep USB bandwidth low at higher resolutions;
+            # not every camera offers MJPG, so check what was negotiated
+            mjpg = cv2.VideoWriter_fourcc(*'MJPG')
+            cap.set(cv2.CAP_PROP_FOURCC, mjpg)
+            if int(cap.get(cv2.CAP_PROP_FOURCC)) != mjpg:
+                logger.info("Camera does not accept MJPG; keeping its default format")
+        
+        if self.capture_size is not None:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.capture_size[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.capture_size[1])
+        if self.capture_fps is not None:
+            cap.set(cv2.CAP_PROP_FPS, self.capture_fps)
+        
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+    
     def stop(self):
         """Stop the vision tracking system"""
         if not self.is_running:
@@ -89,11 +527,20 @@ class VisionTracker:
             
         logger.info("Stopping vision tracker...")
         self.stop_event.set()
+        self._detect_now.set()
         
         if self.tracker_thread:
             self.tracker_thread.join(timeout=5.0)
             self.tracker_thread = None
             
+        if self.detection_thread:
+            self.detection_thread.join(timeout=5.0)
+            self.detection_thread = None
+            
+        if self.capture_thread:
+            self.capture_thread.join(timeout=5.0)
+            self.capture_thread = None
+            
         if self.cap:
             self.cap.release()
             self.cap = None
@@ -101,10 +548,11 @@ class VisionTracker:
         self.is_running = False
         logger.info("Vision tracker stopped")
     
-    def _tracking_loop(self):
-        """Main tracking loop (runs in separate thread)"""
-        logger.info("Starting tracking loop")
-        tracking_initialized = False
+    def _capture_loop(self):
+        """Camera read loop (runs in separate thread)"""
+        logger.info("Starting capture loop")
+        frame_period = self._frame_period
+        deadline = time.monotonic()
         
         while not self.stop_event.is_set():
             # Read frame from camera
@@ -113,77 +561,405 @@ class VisionTracker:
                 logger.error("Failed to read frame from camera")
                 time.sleep(0.1)
                 continue
-                
-            # Check if we need to run detection
-            current_time = time.time()
-            run_detection = (current_time - self.last_detection_time) >= self.detection_interval
             
-            if run_detection or self.target_bbox is None:
-                # Run person detection
-                self.target_bbox = self._detect_person(frame)
-                
-                if self.target_bbox is not None:
-                    # Initialize tracker with new detection
-                    self.tracker = cv2.TrackerKCF_create()
-                    self.tracker.init(frame, self.target_bbox)
-                    tracking_initialized = True
-                    
-                    # Update target position
-                    self._update_target_position(frame, self.target_bbox)
-                    self.last_detection_time = current_time
-            elif tracking_initialized:
-                # Update tracker with new frame
-                success, bbox = self.tracker.update(frame)
-                
-                if success:
-                    self.target_bbox = bbox
-                    # Update target position
-                    self._update_target_position(frame, bbox)
+            if frame.shape[:2] != (self.frame_height, self.frame_width):
+                logger.warning(f"Frame size changed to {frame.shape[1]}x{frame.shape[0]}")
+                self._set_frame_size(frame.shape[1], frame.shape[0])
+            
+            self._frames.write(frame)
+            
+            if frame_period:
+                # Sleep to the next frame time on the monotonic clock
+                deadline += frame_period
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self.stop_event.wait(delay)
                 else:
-                    # Tracking failed, force detection in next iteration
-                    self.last_detection_time = 0
+                    # Fell behind; resync instead of bursting frames
+                    deadline = time.monotonic()
+    
+    def _detection_loop(self):
+        """Person detection loop, once per detection_interval (runs in separate thread)"""
+        logger.info("Starting detection loop")
+        self._tune_tracking_thread()
+        
+        while not self.stop_event.is_set():
+            # Detect on a copy of the newest frame; the tracking thread keeps
+            # consuming frames meanwhile
+            frame, seq = self._frames.copy_latest(out=self._detect_frame)
+            if frame is None:
+                self.stop_event.wait(0.05)
+                continue
+            self._detect_frame = frame
+            
+            detection = self._detect_person(frame)
+            
+            # Publish the frame and take back the previously published one;
+            # the tracking thread swaps a frame out before it reads it, so the
+            # buffer taken back here is never one it is still using
+            with self._detection_lock:
+                self._detection_bbox = detection
+                self._detect_frame, self._detection_frame = self._detection_frame, frame
+                self._detection_seq = seq
+                self._detection_pending = True
+            
+            # Sleep until the next detection, or less if the tracker lost the target
+            self._detect_now.wait(self.detection_interval)
+            self._detect_now.clear()
+    
+    def _tracking_loop(self):
+        """Main tracking loop (runs in separate thread)"""
+        logger.info("Starting tracking loop")
+        self._tune_tracking_thread()
+        self._reset_tracking_state()
+        
+        while not self.stop_event.is_set():
+            # Wait for the newest camera frame; older ones are dropped
+            frame, seq = self._frames.read_latest(timeout=0.5)
+            if frame is None:
+                continue
+            self._track_frame(frame, seq)
+    
+    def _reset_tracking_state(self):
+        """Forget the target so the next detection seeds a new track"""
+        self._tracking_initialized = False
+        self._have_motion_ref = False
+        self._skipped_updates = 0
+        self._last_seq = 0
+    
+    def _track_frame(self, frame, seq):
+        """
+        Advance the track by one camera frame and fuse the newest detection
+        
+        Args:
+            frame: Camera frame to track on
+            seq: Its sequence number from the frame buffer
+        """
+        # Camera frames since the previous one processed here; the filter
+        # advances by that many frames so dropped frames don't skew it
+        last_seq = self._last_seq
+        steps = seq - last_seq if last_seq and seq > last_seq else 1
+        self._last_seq = seq
+        
+        # Take the newest detection, if one arrived since the last frame,
+        # together with its frame so the detection thread cannot reuse it
+        with self._detection_lock:
+            pending = self._detection_pending
+            detection = self._detection_bbox
+            detection_seq = self._detection_seq
+            if pending:
+                self._seed_frame, self._detection_frame = self._detection_frame, self._seed_frame
+            self._detection_pending = False
+        detection_frame = self._seed_frame
+        
+        if pending and detection is None:
+            # Detector lost the person; wait for it to find them again
+            self._tracking_initialized = False
+            self._have_motion_ref = False
+            self._bbox_valid = False
+            return
+        
+        if not self._tracking_initialized:
+            if not pending:
+                return
+            self._reset_track(frame, detection, detection_frame,
+                              max(0, seq - detection_seq))
+            self._tracking_initialized = True
+        elif (not pending and self._have_motion_ref
+                and self._skipped_updates < MOTION_MAX_SKIPPED_FRAMES
+                and self._roi_thumbnail(frame, self.target_bbox, self._motion_cur)
+                and cv2.norm(self._motion_cur, self._motion_ref, cv2.NORM_L1) < self._motion_limit):
+            # Target region is static: keep the box and skip the KCF update.
+            # The filter still steps once per frame so its velocity stays
+            # in pixels per frame when the next KCF box arrives
+            self._skipped_updates += 1
+            self._predict_kalman(steps)
+            self._update_target_position(frame, self.target_bbox)
+            return
+        else:
+            # Update tracker with new frame
+            success, bbox = self.tracker.update(frame)
+            self._skipped_updates = 0
+            
+            if not success:
+                # Tracking failed, ask for a detection to seed a new tracker
+                self._tracking_initialized = False
+                self._have_motion_ref = False
+                self._detect_now.set()
+                return
             
-            # Control loop frequency
-            time.sleep(0.03)  # ~30fps
+            self._predict_kalman(steps)
+            self._correct_kalman(self._box_measurement(bbox), self._tracker_noise)
+            
+            if pending:
+                # The detection ran on an older frame; carry it forward
+                # to this one before comparing or correcting
+                lag = max(0, seq - detection_seq)
+                measurement, noise = self._detection_measurement(detection, lag)
+                if (self._mahalanobis_sq(measurement, noise) > KALMAN_REINIT_DISTANCE
+                        or self._kalman_iou(measurement) < KALMAN_REINIT_IOU):
+                    # Tracker has drifted off the person
+                    self._reset_track(frame, detection, detection_frame, lag)
+                else:
+                    self._correct_kalman(measurement, noise)
+        
+        # Publish the filtered box and update target position
+        self._publish_kalman_bbox()
+        self._update_target_position(frame, self.target_bbox)
+        self._have_motion_ref = self._roi_thumbnail(frame, self.target_bbox, self._motion_ref)
+    
+    def _create_kalman(self):
+        """Constant-velocity Kalman filter over (cx, cy, w, h, vx, vy)"""
+        kalman = cv2.KalmanFilter(6, 4)
+        transition = np.eye(6, dtype=np.float32)
+        transition[0, 4] = 1.0
+        transition[1, 5] = 1.0
+        kalman.transitionMatrix = transition
+        kalman.measurementMatrix = np.eye(4, 6, dtype=np.float32)
+        kalman.processNoiseCov = np.eye(6, dtype=np.float32) * KALMAN_PROCESS_NOISE
+        kalman.measurementNoiseCov = np.eye(4, dtype=np.float32) * KALMAN_TRACKER_NOISE
+        return kalman
+    
+    def _reset_track(self, frame, bbox, detection_frame, lag):
+        """
+        Seed a new KCF tracker with a box detected lag frames ago on
+        detection_frame, carry it forward to frame, and restart the Kalman
+        filter there with the velocity seen over the lag
+        """
+        # KCF cannot be re-initialized in place, so seed a new one
+        self.tracker = cv2.TrackerKCF_create()
+        self.tracker.init(detection_frame, tuple(bbox))
+        
+        x, y, w, h = bbox
+        cx, cy = x + w / 2, y + h / 2
+        vx = vy = 0.0
+        if lag > 0:
+            success, moved = self.tracker.update(frame)
+            if success:
+                x, y, w, h = moved
+                vx = (x + w / 2 - cx) / lag
+                vy = (y + h / 2 - cy) / lag
+                cx, cy = x + w / 2, y + h / 2
+        
+        self._kalman.statePost = np.array(
+            [[cx], [cy], [w], [h], [vx], [vy]], dtype=np.float32)
+        self._kalman.errorCovPost = np.eye(6, dtype=np.float32) * KALMAN_DETECTION_NOISE
+    
+    def _predict_kalman(self, steps):
+        """Kalman prediction step over the given number of camera frames"""
+        kalman = self._kalman
+        if kalman.transitionMatrix[0, 4] != steps:
+            transition = kalman.transitionMatrix
+            transition[0, 4] = steps
+            transition[1, 5] = steps
+            kalman.transitionMatrix = transition
+            kalman.processNoiseCov = np.eye(6, dtype=np.float32) * (KALMAN_PROCESS_NOISE * steps)
+        kalman.predict()
+    
+    def _box_measurement(self, bbox):
+        """(x, y, w, h) box as a (cx, cy, w, h) measurement vector"""
+        x, y, w, h = bbox
+        m = self._measurement
+        m[0, 0] = x + w / 2
+        m[1, 0] = y + h / 2
+        m[2, 0] = w
+        m[3, 0] = h
+        return m
+    
+    def _detection_measurement(self, bbox, lag):
+        """
+        Measurement and noise covariance for a box detected lag frames ago.
+        The centre is moved on by the filtered velocity, and the noise grows
+        by the process noise and velocity uncertainty accumulated over the lag.
+        """
+        x, y, w, h = bbox
+        state = self._kalman.statePost[:, 0]
+        cov = self._kalman.errorCovPost
+        measurement = np.array([[x + w / 2 + state[4] * lag],
+                                [y + h / 2 + state[5] * lag],
+                                [w], [h]], dtype=np.float32)
+        noise = np.eye(4, dtype=np.float32) * (KALMAN_DETECTION_NOISE + KALMAN_PROCESS_NOISE * lag)
+        noise[0, 0] += cov[4, 4] * lag * lag
+        noise[1, 1] += cov[5, 5] * lag * lag
+        return measurement, noise
+    
+    def _correct_kalman(self, measurement, noise):
+        """Kalman correction step with a (cx, cy, w, h) measurement and its covariance"""
+        self._kalman.measurementNoiseCov = noise
+        self._kalman.correct(measurement)
+    
+    def _mahalanobis_sq(self, measurement, noise):
+        """Squared Mahalanobis distance of a measurement from the filtered box"""
+        innovation = measurement[:, 0] - self._kalman.statePost[:4, 0]
+        covariance = self._kalman.errorCovPost[:4, :4] + noise
+        return float(innovation @ np.linalg.solve(covariance, innovation))
+    
+    def _kalman_iou(self, measurement):
+        """Intersection over union of a (cx, cy, w, h) measurement and the filtered box"""
+        mcx, mcy, mw, mh = measurement[:, 0].tolist()
+        kcx, kcy, kw, kh = self._kalman.statePost[:4, 0].tolist()
+        ix = min(mcx + mw / 2, kcx + kw / 2) - max(mcx - mw / 2, kcx - kw / 2)
+        iy = min(mcy + mh / 2, kcy + kh / 2) - max(mcy - mh / 2, kcy - kh / 2)
+        if ix <= 0 or iy <= 0:
+            return 0.0
+        inter = ix * iy
+        return inter / (mw * mh + kw * kh - inter)
+    
+    def _publish_kalman_bbox(self):
+        """Write the filtered box into target_bbox"""
+        cx, cy, w, h = self._kalman.statePost[:4, 0].tolist()
+        w = max(w, 1.0)
+        h = max(h, 1.0)
+        self.target_bbox[:] = (int(cx - w / 2), int(cy - h / 2), int(w), int(h))
+        self._bbox_valid = True
+    
+    def _roi_thumbnail(self, frame, bbox, out):
+        """
+        Write a MOTION_ROI_SIZE grayscale thumbnail of the bbox region of frame
+        into out
+        
+        Returns:
+            bool: False if the box lies outside the frame
+        """
+        x, y, w, h = bbox.tolist()
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x1 <= x0 or y1 <= y0:
+            return False
+        
+        cv2.resize(frame[y0:y1, x0:x1], MOTION_ROI_SIZE, dst=self._roi_small,
+                   interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._roi_small, cv2.COLOR_BGR2GRAY, dst=out)
+        return True
+    
+    def _tune_tracking_thread(self):
+        """
+        Pin the calling (tracking or detection) thread to tracking_cpus and
+        apply tracking_nice, so the HOG/KCF working set stays in cache.
+        Either step is skipped with a warning if unsupported or unprivileged.
+        """
+        thread_id = threading.get_native_id()
+        name = threading.current_thread().name
+        
+        cpus = self.tracking_cpus
+        if cpus and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(thread_id, cpus)
+                logger.info(f"Pinned {name} to CPUs {sorted(cpus)}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not pin {name}: {e}")
+        
+        if self.tracking_nice is not None and platform.system() == 'Linux':
+            # Linux nice values are per thread, so this leaves the rest of
+            # the process alone
+            try:
+                os.setpriority(os.PRIO_PROCESS, thread_id, self.tracking_nice)
+                logger.info(f"{name} nice value set to {self.tracking_nice}")
+            except OSError as e:
+                logger.warning(f"Could not raise {name} priority: {e}")
+    
+    def _load_net(self, model_path, config_path):
+        """Load the DNN detector on the best available backend/target"""
+        net = cv2.dnn.readNet(model_path, config_path or "")
+        
+        for backend, target in DNN_BACKEND_TARGET_PAIRS:
+            if backend is None or target is None:
+                continue
+            if target in cv2.dnn.getAvailableTargets(backend):
+                net.setPreferableBackend(backend)
+                net.setPreferableTarget(target)
+                logger.info(f"DNN detector using backend {backend}, target {target}")
+                break
+        
+        return net
     
     def _detect_person(self, frame):
         """
-        Detect person in frame using HOG detector
+        Detect person in frame using the DNN detector, or HOG without one
         
         Returns:
             tuple: (x, y, w, h) bounding box or None if no person detected
         """
-        # Resize frame for faster processing
-        frame_resized = cv2.resize(frame, (min(frame.shape[1], 640), 
-                                         min(frame.shape[0], 480)))
-        scale_factor = frame.shape[1] / frame_resized.shape[1]
-        
-        # Detect people
-        boxes, weights = self.hog.detectMultiScale(
-            frame_resized,
-            winStride=(8, 8),
-            padding=(8, 8),
-            scale=1.05
-        )
+        if self.net is not None:
+            return self._detect_person_dnn(frame)
         
-        if len(boxes) == 0:
+        # HOG only uses intensity, so work on one channel instead of three
+        if self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        
+        # Detect people on a frame resized to self._detect_size
+        if self.d_hog is not None:
+            boxes = self._detect_people_cuda(gray)
+        else:
+            if self._use_opencl:
+                gray = cv2.UMat(gray)
+            gray_resized = cv2.resize(gray, self._detect_size)
+            boxes, weights = self.hog.detectMultiScale(
+                gray_resized,
+                winStride=HOG_WIN_STRIDE,
+                padding=HOG_PADDING,
+                scale=HOG_SCALE
+            )
+        
+        boxes = np.asarray(boxes)
+        if boxes.size == 0:
             return None
             
         # Get the largest box (assuming it's the closest person)
-        largest_box = max(boxes, key=lambda box: box[2] * box[3])
+        largest_box = boxes[np.argmax(boxes[:, 2] * boxes[:, 3])]
         
         # Scale box back to original frame size
-        x, y, w, h = largest_box
-        box_rescaled = (
-            int(x * scale_factor),
-            int(y * scale_factor),
-            int(w * scale_factor),
-            int(h * scale_factor)
-        )
+        box_rescaled = tuple((largest_box * self._scale_vec).astype(int).tolist())
         
         logger.debug(f"Person detected: {box_rescaled}")
         return box_rescaled
     
+    def _detect_person_dnn(self, frame):
+        """
+        Detect person in frame using the SSD network
+        
+        Returns:
+            tuple: (x, y, w, h) bounding box or None if no person detected
+        """
+        frame_h, frame_w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, DNN_SCALE, DNN_INPUT_SIZE, DNN_MEAN)
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+        
+        # Each row: [image_id, class_id, confidence, x1, y1, x2, y2] (normalized)
+        people = detections[(detections[:, 1] == DNN_PERSON_CLASS_ID) &
+                            (detections[:, 2] > DNN_CONFIDENCE_THRESHOLD)]
+        if len(people) == 0:
+            return None
+        
+        # Get the largest box (assuming it's the closest person)
+        corners = people[:, 3:7]
+        areas = (corners[:, 2] - corners[:, 0]) * (corners[:, 3] - corners[:, 1])
+        x1, y1, x2, y2 = corners[np.argmax(areas)]
+        box = (
+            int(x1 * frame_w),
+            int(y1 * frame_h),
+            int((x2 - x1) * frame_w),
+            int((y2 - y1) * frame_h)
+        )
+        
+        logger.debug(f"Person detected: {box}")
+        return box
+    
+    def _detect_people_cuda(self, gray):
+        """
+        Upload the grayscale frame, then resize and run HOG on the GPU
+        
+        Returns:
+            list: (x, y, w, h) boxes in the resized frame
+        """
+        self._gpu_gray.upload(gray)
+        cv2.cuda.resize(self._gpu_gray, self._detect_size, self._gpu_small,
+                        interpolation=cv2.INTER_LINEAR)
+        return self.d_hog.detectMultiScaleWithoutConf(self._gpu_small)
+    
     def _update_target_position(self, frame, bbox):
         """
         Update 3D target position based on bounding box
@@ -191,63 +967,52 @@ class VisionTracker:
         This converts the 2D image position to a 3D position in
         local NED coordinates (North-East-Down)
         """
-        if bbox is None:
-            self.target_position = None
-            return
-            
-        x, y, w, h = bbox
-        
         # Calculate center of bounding box
-        center_x = x + w // 2
-        center_y = y + h // 2
-        
-        # Calculate distance based on apparent size
-        # Using simple pinhole camera model: 
-        # distance = (real_width * focal_length) / apparent_width
-        distance_z = (self.real_width * self.focal_length) / w
-        
-        # Calculate horizontal position (x, y) relative to camera
-        # Convert from pixel coordinates to meters using similar triangle
-        pixel_to_meter = self.real_width / w
-        pos_x = (center_x - self.frame_center[0]) * pixel_to_meter
-        pos_y = (center_y - self.frame_center[1]) * pixel_to_meter
-        
-        # Convert to NED coordinates (assuming camera pointing north)
-        # In NED: x=North, y=East, z=Down
-        # This is a simplified conversion and would need to be adjusted
-        # based on actual drone orientation and camera mounting
-        ned_x = distance_z  # Person is in front of drone (North)
-        ned_y = -pos_x      # Positive pixel x is right, negative NED y is right (East)
-        ned_z = -1.7        # Assuming person height, camera pointing horizontally
-        
-        self.target_position = (ned_x, ned_y, ned_z)
-        logger.debug(f"Target position updated: {self.target_position}")
+        center_x, center_y = (bbox[:2] + bbox[2:] // 2).tolist()
+        
+        target_position = _pos_from_bbox(
+            float(center_x), float(center_y), float(bbox[2]),
+            self._rw_f, self._rw, self._fcx, self._fcy)
+        self._latest = (target_position, time.monotonic())
+        logger.debug(f"Target position updated: {target_position}")
     
     def get_target_position(self):
         """Get the current target position in local NED coordinates"""
-        return self.target_position
+        position, timestamp = self._latest
+        if time.monotonic() - timestamp > self.target_timeout:
+            return None
+        return position
     
     def get_target_distance(self):
         """Get estimated distance to target in meters"""
-        if self.target_position is None:
+        target_position = self.get_target_position()
+        if target_position is None:
             return None
             
         # Calculate Euclidean distance
-        x, y, z = self.target_position
-        return np.sqrt(x**2 + y**2)
+        return math.hypot(*target_position)
     
     def capture_frame(self):
-        """Capture a frame for display/debugging"""
-        if not self.cap or not self.cap.isOpened():
+        """
+        Capture a frame for display/debugging
+        
+        Returns:
+            np.ndarray: Annotated copy of the newest frame, or None. The array
+                        is reused, so it is overwritten by the next call
+        """
+        if not self.is_running or self._frames is None:
             return None
-            
-        ret, frame = self.cap.read()
-        if not ret:
+        
+        # Take the newest frame from the capture thread rather than reading
+        # the camera a second time
+        frame, _ = self._frames.copy_latest(out=self._display_buffer)
+        if frame is None:
             return None
+        self._display_buffer = frame
             
         # Draw target bounding box if available
-        if self.target_bbox is not None:
-            x, y, w, h = [int(v) for v in self.target_bbox]
+        if self._bbox_valid:
+            x, y, w, h = self.target_bbox.tolist()
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
             
             # Draw distance